@@ -0,0 +1,133 @@
+"""
+Response Cache
+Stale-while-revalidate TTL cache for slowly changing GlueX API data
+"""
+
+import functools
+import inspect
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+class TTLCache:
+    """
+    Thread-safe cache whose entries are fresh for `ttl` seconds and can
+    still be served (while being refreshed) until `stale` seconds old
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[Any, float, float, float]] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0}
+
+    def get(self, key: Hashable) -> Tuple[Optional[Any], str]:
+        """
+        Look up a cached value
+
+        Returns:
+            Tuple of (value, state) where state is FRESH, STALE or MISS
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                value, fetched_at, ttl, stale = entry
+                age = time.monotonic() - fetched_at
+                if age < ttl:
+                    self.stats["hits"] += 1
+                    return value, FRESH
+                if age < stale:
+                    self.stats["stale_hits"] += 1
+                    return value, STALE
+                del self._entries[key]
+
+            self.stats["misses"] += 1
+            return None, MISS
+
+    def set(self, key: Hashable, value: Any, ttl: float, stale: float):
+        """Store a value with its fresh and stale windows"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic(), ttl, stale)
+
+    def refresh(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl: float,
+        stale: float
+    ):
+        """Reload a stale entry in a background thread (once per key at a time)"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self.stats["refreshes"] += 1
+
+        def run():
+            try:
+                value = loader()
+                if value is not None:
+                    self.set(key, value, ttl, stale)
+            except Exception as e:
+                logger.error("Error refreshing cache entry %s: %s", key, e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def invalidate(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+def swr_cache(ttl: float = 60, stale: float = 600):
+    """
+    Memoize a client getter with stale-while-revalidate semantics
+
+    Entries live in the instance's `cache` (a TTLCache) and are keyed by
+    method name plus bound arguments. Fresh hits return immediately, stale
+    hits return the cached value and refresh it in the background, misses
+    call through. None results (errors) are never cached.
+
+    Args:
+        ttl: Seconds a result is served without refreshing
+        stale: Seconds a result may be served at all
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def key_for(*args, **kwargs) -> Tuple:
+            bound = signature.bind(None, *args, **kwargs)
+            bound.apply_defaults()
+            return (func.__name__,) + tuple(bound.arguments.values())[1:]
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = key_for(*args, **kwargs)
+            value, state = self.cache.get(key)
+
+            if state == MISS:
+                value = func(self, *args, **kwargs)
+                if value is not None:
+                    self.cache.set(key, value, ttl, stale)
+            elif state == STALE:
+                self.cache.refresh(key, lambda: func(self, *args, **kwargs), ttl, stale)
+
+            return value
+
+        wrapper.key_for = key_for
+        wrapper.ttl = ttl
+        wrapper.stale = stale
+        return wrapper
+
+    return decorator
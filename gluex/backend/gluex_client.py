@@ -3,14 +3,20 @@ GlueX API Client
 Handles interactions with GlueX Yields API and Router API
 """
 
-import requests
+import asyncio
+import httpx
 import time
 import hmac
 import hashlib
-import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import logging
+import numpy as np
+
+from cache import MISS, STALE, TTLCache, swr_cache
+from scoring import calculate_risk_scores, select_best
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,6 +32,61 @@ class YieldData:
     timestamp: int
 
 
+@dataclass(eq=False)
+class YieldTable:
+    """
+    Yield information for many vaults, stored column-wise
+    
+    Scoring works directly on the NumPy columns; iterating or indexing
+    yields YieldData rows for code that expects a list of vaults.
+    """
+    addresses: np.ndarray  # object array of vault address strings
+    apy: np.ndarray
+    tvl: np.ndarray
+    risk_score: np.ndarray
+    timestamps: np.ndarray
+    
+    @classmethod
+    def allocate(cls, size: int) -> "YieldTable":
+        """Create an uninitialized table for `size` vaults fetched now"""
+        return cls(
+            addresses=np.empty(size, dtype=object),
+            apy=np.empty(size, dtype=np.float64),
+            tvl=np.empty(size, dtype=np.float64),
+            risk_score=np.empty(size, dtype=np.float64),
+            timestamps=np.full(size, int(time.time()), dtype=np.int64)
+        )
+    
+    def select(self, mask: np.ndarray) -> "YieldTable":
+        """Return the rows where `mask` is True"""
+        return YieldTable(
+            addresses=self.addresses[mask],
+            apy=self.apy[mask],
+            tvl=self.tvl[mask],
+            risk_score=self.risk_score[mask],
+            timestamps=self.timestamps[mask]
+        )
+    
+    def row(self, i: int) -> YieldData:
+        """Return row `i` as a YieldData"""
+        return YieldData(
+            vault_address=self.addresses[i],
+            apy=float(self.apy[i]),
+            tvl=float(self.tvl[i]),
+            risk_score=float(self.risk_score[i]),
+            timestamp=int(self.timestamps[i])
+        )
+    
+    def __len__(self) -> int:
+        return len(self.addresses)
+    
+    def __getitem__(self, i: int) -> YieldData:
+        return self.row(i)
+    
+    def __iter__(self):
+        return (self.row(i) for i in range(len(self)))
+
+
 @dataclass
 class SwapQuote:
     """Represents a swap quote from GlueX Router"""
@@ -45,6 +106,14 @@ class GlueXClient:
     YIELDS_API_BASE = "https://yield-api.gluex.xyz"
     ROUTER_API_BASE = "https://router-api.gluex.xyz"
     
+    # Retry policy for transient GlueX API failures
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.3  # Seconds, doubled after every attempt
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    
+    # Connection pool per API host
+    POOL_SIZE = 32
+    
     def __init__(self, api_key: str, api_secret: str):
         """
         Initialize GlueX client
@@ -55,22 +124,109 @@ class GlueXClient:
         """
         self.api_key = api_key
         self.api_secret = api_secret
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Keyed HMAC state; copying it skips re-deriving the pads per request
+        self._hmac_proto = hmac.new(api_secret.encode(), None, hashlib.sha256)
+        self.cache = TTLCache()
+        # Cleared once the yields API reports it has no batch endpoint
+        self._batch_supported = True
+        self.headers = {
             "Content-Type": "application/json",
             "X-API-Key": api_key
-        })
+        }
+        # HTTP/2 multiplexes all yield/router calls over one connection per host.
+        # Each host gets its own tuned pool; when it is exhausted requests wait
+        # for a free connection instead of opening throwaway sockets.
+        self.session = httpx.Client(**self._client_options(httpx.HTTPTransport))
+        # Async counterpart with the same tuning, created on first async call
+        self._async_session: Optional[httpx.AsyncClient] = None
+    
+    def _client_options(self, transport_class) -> Dict:
+        """Keyword arguments shared by the sync and async clients"""
+        return {
+            "http2": True,
+            "headers": self.headers,
+            "timeout": httpx.Timeout(10.0, connect=5.0),
+            "mounts": {
+                self.YIELDS_API_BASE: self._make_transport(transport_class),
+                self.ROUTER_API_BASE: self._make_transport(transport_class)
+            }
+        }
+    
+    def _make_transport(self, transport_class=httpx.HTTPTransport):
+        """Create a pooled keep-alive transport that retries failed connects"""
+        return transport_class(
+            http2=True,
+            retries=self.MAX_RETRIES,
+            limits=httpx.Limits(
+                max_connections=self.POOL_SIZE,
+                max_keepalive_connections=16,
+                keepalive_expiry=60
+            )
+        )
+    
+    @property
+    def async_session(self) -> httpx.AsyncClient:
+        """
+        Long-lived async client, so every cycle reuses its connections
+        
+        Its pool is bound to the event loop that first uses it.
+        """
+        if self._async_session is None:
+            self._async_session = httpx.AsyncClient(
+                **self._client_options(httpx.AsyncHTTPTransport)
+            )
+        return self._async_session
+    
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+        
+        if self._async_session is not None:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                asyncio.run(self.aclose())
+            else:
+                logger.warning("close() called inside an event loop, use aclose()")
+    
+    async def aclose(self):
+        """Close pooled connections from inside the event loop"""
+        self.session.close()
+        
+        if self._async_session is not None:
+            await self._async_session.aclose()
+            self._async_session = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _post_json(self, url: str, payload: Dict) -> Dict:
+        """
+        POST a JSON payload and parse the JSON response
+        
+        Throttled/5xx responses are retried with exponential backoff; any
+        other failure raises httpx.HTTPError (or ValueError for bad JSON).
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            response = self.session.post(url, json=payload)
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.MAX_RETRIES:
+                break
+            time.sleep(self.RETRY_BACKOFF * 2 ** attempt)
+        
+        logger.debug("POST %s over %s", url, response.http_version)
+        response.raise_for_status()
+        return orjson.loads(response.content)
     
     def _generate_signature(self, data: Dict) -> str:
         """Generate HMAC signature for request"""
-        message = json.dumps(data, sort_keys=True)
-        signature = hmac.new(
-            self.api_secret.encode(),
-            message.encode(),
-            hashlib.sha256
-        ).hexdigest()
-        return signature
+        signature = self._hmac_proto.copy()
+        signature.update(orjson.dumps(data, option=orjson.OPT_SORT_KEYS))
+        return signature.hexdigest()
     
+    @swr_cache(ttl=60, stale=600)
     def get_historical_apy(
         self,
         lp_token_address: str,
@@ -93,13 +249,12 @@ class GlueXClient:
         }
         
         try:
-            response = self.session.post(endpoint, json=payload)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching historical APY: {e}")
+            return self._post_json(endpoint, payload)
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error("Error fetching historical APY: %s", e)
             return None
     
+    @swr_cache(ttl=60, stale=600)
     def get_diluted_apy(
         self,
         lp_token_address: str,
@@ -125,11 +280,9 @@ class GlueXClient:
         }
         
         try:
-            response = self.session.post(endpoint, json=payload)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching diluted APY: {e}")
+            return self._post_json(endpoint, payload)
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error("Error fetching diluted APY: %s", e)
             return None
     
     def get_multiple_vault_yields(
@@ -137,50 +290,279 @@ class GlueXClient:
         vault_addresses: List[str],
         amount: str = "1000000000000",  # Default: 1M USDC (6 decimals = 1e12)
         chain: str = "hyperevm"
-    ) -> List[YieldData]:
+    ) -> YieldTable:
         """
         Get yield data for multiple vaults
         
+        The two endpoint calls for every vault run concurrently on a thread
+        pool sharing the pooled session, so this is also safe to call from
+        code that already runs inside an event loop.
+        
         Args:
             vault_addresses: List of vault addresses
             amount: Amount to use for diluted APY calculation
             chain: Blockchain identifier
             
         Returns:
-            List of YieldData objects
+            YieldTable (iterates as YieldData rows)
         """
-        yield_data_list = []
+        if not vault_addresses:
+            return YieldTable.allocate(0)
+        
+        hist_results: Dict[str, Optional[Dict]] = {}
+        diluted_results: Dict[str, Optional[Dict]] = {}
         
+        # Stay within the connection pool so workers never queue on sockets
+        max_workers = min(2 * len(vault_addresses), self.POOL_SIZE)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.get_historical_apy, vault_address, chain):
+                    (hist_results, vault_address)
+                for vault_address in vault_addresses
+            }
+            futures.update({
+                executor.submit(self.get_diluted_apy, vault_address, amount, chain):
+                    (diluted_results, vault_address)
+                for vault_address in vault_addresses
+            })
+            
+            for future in as_completed(futures):
+                results, vault_address = futures[future]
+                results[vault_address] = future.result()
+        
+        return self._build_yield_table(vault_addresses, [
+            (hist_results.get(vault_address), diluted_results.get(vault_address))
+            for vault_address in vault_addresses
+        ])
+    
+    async def aget_multiple_vault_yields(
+        self,
+        vault_addresses: List[str],
+        amount: str = "1000000000000",
+        chain: str = "hyperevm"
+    ) -> YieldTable:
+        """
+        Get yield data for multiple vaults concurrently
+        
+        Both endpoints are queried for every vault at once over the shared
+        HTTP/2 async client, so latency is roughly one round-trip instead of 2N.
+        
+        Args:
+            vault_addresses: List of vault addresses
+            amount: Amount to use for diluted APY calculation
+            chain: Blockchain identifier
+            
+        Returns:
+            YieldTable (iterates as YieldData rows)
+        """
+        historical_endpoint = f"{self.YIELDS_API_BASE}/historical-apy"
+        diluted_endpoint = f"{self.YIELDS_API_BASE}/diluted-apy"
+        
+        tasks = []
         for vault_address in vault_addresses:
+            tasks.append(self._acached(
+                GlueXClient.get_historical_apy, historical_endpoint, {
+                    "lp_token_address": vault_address,
+                    "chain": chain
+                },
+                vault_address, chain
+            ))
+            tasks.append(self._acached(
+                GlueXClient.get_diluted_apy, diluted_endpoint, {
+                    "lp_token_address": vault_address,
+                    "chain": chain,
+                    "amount": amount
+                },
+                vault_address, amount, chain
+            ))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        responses = []
+        
+        for hist_data, diluted_data in zip(results[0::2], results[1::2]):
+            if isinstance(hist_data, Exception):
+                logger.error("Error fetching historical APY: %s", hist_data)
+                hist_data = None
+            if isinstance(diluted_data, Exception):
+                logger.error("Error fetching diluted APY: %s", diluted_data)
+                diluted_data = None
+            responses.append((hist_data, diluted_data))
+        
+        return self._build_yield_table(vault_addresses, responses)
+    
+    def get_yields_batch(
+        self,
+        vault_addresses: List[str],
+        amount: str = "1000000000000",
+        chain: str = "hyperevm"
+    ) -> YieldTable:
+        """
+        Get yield data for multiple vaults in a single request
+        
+        Falls back to per-vault requests (get_multiple_vault_yields) if the
+        batch request fails or returns a malformed body, and for good once
+        the endpoint answers with a client error (4xx other than 429).
+        
+        Args:
+            vault_addresses: List of vault addresses
+            amount: Amount to use for diluted APY calculation
+            chain: Blockchain identifier
+            
+        Returns:
+            YieldTable (iterates as YieldData rows)
+        """
+        if self._batch_supported and vault_addresses:
+            endpoint = f"{self.YIELDS_API_BASE}/batch-diluted-apy"
+            
+            try:
+                data = self._post_json(endpoint, self._batch_payload(vault_addresses, amount, chain))
+                return self._parse_batch(vault_addresses, data)
+            except (httpx.HTTPError, ValueError) as e:
+                self._handle_batch_error(e)
+        
+        return self.get_multiple_vault_yields(vault_addresses, amount, chain)
+    
+    async def aget_yields_batch(
+        self,
+        vault_addresses: List[str],
+        amount: str = "1000000000000",
+        chain: str = "hyperevm"
+    ) -> YieldTable:
+        """
+        Async version of get_yields_batch
+        
+        Args:
+            vault_addresses: List of vault addresses
+            amount: Amount to use for diluted APY calculation
+            chain: Blockchain identifier
+            
+        Returns:
+            YieldTable (iterates as YieldData rows)
+        """
+        if self._batch_supported and vault_addresses:
+            endpoint = f"{self.YIELDS_API_BASE}/batch-diluted-apy"
+            
+            try:
+                data = await self._apost_json(
+                    endpoint, self._batch_payload(vault_addresses, amount, chain)
+                )
+                return self._parse_batch(vault_addresses, data)
+            except (httpx.HTTPError, ValueError) as e:
+                self._handle_batch_error(e)
+        
+        return await self.aget_multiple_vault_yields(vault_addresses, amount, chain)
+    
+    def _batch_payload(self, vault_addresses: List[str], amount: str, chain: str) -> Dict:
+        """Build the batch-diluted-apy request body"""
+        return {
+            "chain": chain,
+            "requests": [
+                {"lp_token_address": vault_address, "amount": amount}
+                for vault_address in vault_addresses
+            ]
+        }
+    
+    def _parse_batch(self, vault_addresses: List[str], data: Dict) -> YieldTable:
+        """
+        Convert a batch response (results in request order) into a YieldTable
+        
+        Raises ValueError unless the body holds one result per vault.
+        """
+        results = data.get('results') if isinstance(data, dict) else None
+        if not isinstance(results, list) or len(results) != len(vault_addresses):
+            raise ValueError("unexpected batch response shape")
+        
+        # Each result carries both the diluted APY and the pool TVL
+        return self._build_yield_table(vault_addresses, [
+            (result, result) for result in results
+        ])
+    
+    def _handle_batch_error(self, error: Exception):
+        """Log a failed batch request, disabling batching if unsupported"""
+        status_code = (
+            error.response.status_code if isinstance(error, httpx.HTTPStatusError) else None
+        )
+        # Client errors other than throttling mean the API has no such route
+        if status_code and status_code < 500 and status_code not in self.RETRY_STATUSES:
+            logger.info(
+                "GlueX batch endpoint not available (HTTP %d), using per-vault requests",
+                status_code
+            )
+            self._batch_supported = False
+        else:
+            logger.error("Error fetching batch yields: %s", error)
+    
+    async def _acached(
+        self,
+        getter,
+        url: str,
+        payload: Dict,
+        *args
+    ) -> Dict:
+        """Serve an swr_cache'd getter's entry, fetching it asynchronously on a miss"""
+        key = getter.key_for(*args)
+        value, state = self.cache.get(key)
+        
+        if state == STALE:
+            self.cache.refresh(key, lambda: getter.__wrapped__(self, *args), getter.ttl, getter.stale)
+        if state != MISS:
+            return value
+        
+        value = await self._apost_json(url, payload)
+        self.cache.set(key, value, getter.ttl, getter.stale)
+        return value
+    
+    async def _apost_json(self, url: str, payload: Dict) -> Dict:
+        """Async version of _post_json (over the shared async client)"""
+        for attempt in range(self.MAX_RETRIES + 1):
+            response = await self.async_session.post(url, json=payload)
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.MAX_RETRIES:
+                break
+            await asyncio.sleep(self.RETRY_BACKOFF * 2 ** attempt)
+        
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
+    def _build_yield_table(
+        self,
+        vault_addresses: List[str],
+        responses: List[Tuple[Optional[Dict], Optional[Dict]]]
+    ) -> YieldTable:
+        """
+        Assemble a YieldTable from (historical, diluted) APY response pairs
+        
+        Vaults whose responses are missing or malformed are left out.
+        """
+        table = YieldTable.allocate(len(vault_addresses))
+        filled = np.zeros(len(vault_addresses), dtype=bool)
+        
+        for i, (vault_address, (hist_data, diluted_data)) in enumerate(
+            zip(vault_addresses, responses)
+        ):
             try:
-                # Get historical APY
-                hist_data = self.get_historical_apy(vault_address, chain)
-                
-                # Get diluted APY for given amount
-                diluted_data = self.get_diluted_apy(vault_address, amount, chain)
-                
                 if hist_data and diluted_data:
                     # Extract relevant data (structure depends on actual API response)
                     # This is a template - adjust based on actual API response format
                     apy = diluted_data.get('apy', 0) if diluted_data else hist_data.get('apy', 0)
                     tvl = hist_data.get('tvl', 0)
                     
-                    yield_data = YieldData(
-                        vault_address=vault_address,
-                        apy=float(apy),
-                        tvl=float(tvl),
-                        risk_score=self._calculate_risk_score(apy, tvl),
-                        timestamp=int(time.time())
-                    )
-                    yield_data_list.append(yield_data)
+                    table.addresses[i] = vault_address
+                    table.apy[i] = float(apy)
+                    table.tvl[i] = float(tvl)
+                    filled[i] = True
                     
-                    logger.info(f"Vault {vault_address[:10]}...: APY={apy}%, TVL=${tvl:,.0f}")
+                    logger.info(
+                        "Vault %s...: APY=%s%%, TVL=$%.0f",
+                        vault_address[:10], table.apy[i], table.tvl[i]
+                    )
                     
             except Exception as e:
-                logger.error(f"Error processing vault {vault_address}: {e}")
-                continue
+                logger.error("Error processing vault %s: %s", vault_address, e)
         
-        return yield_data_list
+        table = table.select(filled)
+        table.risk_score = calculate_risk_scores(table.apy, table.tvl)
+        return table
     
     def get_router_quote(
         self,
@@ -220,9 +602,7 @@ class GlueXClient:
         }
         
         try:
-            response = self.session.post(endpoint, json=payload)
-            response.raise_for_status()
-            data = response.json()
+            data = self._post_json(endpoint, payload)
             
             if data.get('statusCode') == 200:
                 result = data['result']
@@ -237,11 +617,11 @@ class GlueXClient:
                     value=result['value']
                 )
             else:
-                logger.error(f"Router API error: {data}")
+                logger.error("Router API error: %s", data)
                 return None
                 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching router quote: {e}")
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error("Error fetching router quote: %s", e)
             return None
     
     def _calculate_risk_score(self, apy: float, tvl: float) -> float:
@@ -308,31 +688,51 @@ class GlueXClient:
         Returns:
             Tuple of (best_vault_address, yield_data, score) or None
         """
-        yield_data_list = self.get_multiple_vault_yields(vault_addresses, amount)
+        table = self.get_yields_batch(vault_addresses, amount)
         
-        if not yield_data_list:
+        if not len(table):
             return None
         
-        best_vault = None
-        best_score = -float('inf')
+        return self._pick_best(table, optimize_for)
+    
+    async def afind_best_yield_opportunity(
+        self,
+        vault_addresses: List[str],
+        amount: str,
+        optimize_for: str = "sharpe"
+    ) -> Optional[Tuple[str, YieldData, float]]:
+        """
+        Async version of find_best_yield_opportunity
         
-        for data in yield_data_list:
-            if optimize_for == "sharpe":
-                score = self.calculate_sharpe_ratio(data)
-            elif optimize_for == "apy":
-                score = data.apy
-            elif optimize_for == "safety":
-                score = -data.risk_score  # Lower risk = higher score
-            else:
-                score = self.calculate_sharpe_ratio(data)
-            
-            logger.info(f"Vault {data.vault_address[:10]}...: Score={score:.4f}")
+        Args:
+            vault_addresses: List of vault addresses to compare
+            amount: Amount to invest
+            optimize_for: Optimization metric
             
-            if score > best_score:
-                best_score = score
-                best_vault = (data.vault_address, data, score)
+        Returns:
+            Tuple of (best_vault_address, yield_data, score) or None
+        """
+        table = await self.aget_yields_batch(vault_addresses, amount)
+        
+        if not len(table):
+            return None
+        
+        return self._pick_best(table, optimize_for)
+    
+    def _pick_best(
+        self,
+        table: YieldTable,
+        optimize_for: str
+    ) -> Tuple[str, YieldData, float]:
+        """Score all vaults in one vectorized pass and return the best one"""
+        # Risk scores were already filled in by _build_yield_table
+        scores, best = select_best(table.apy, table.risk_score, optimize_for)
         
-        return best_vault
+        if logger.isEnabledFor(logging.INFO):
+            for vault_address, score in zip(table.addresses, scores.tolist()):
+                logger.info("Vault %s...: Score=%.4f", vault_address[:10], score)
+        
+        return table.addresses[best], table.row(best), float(scores[best])
 
 
 def test_client():
@@ -345,8 +745,6 @@ def test_client():
     api_key = os.getenv('GLUEX_API_KEY', 'test_key')
     api_secret = os.getenv('GLUEX_API_SECRET', 'test_secret')
     
-    client = GlueXClient(api_key, api_secret)
-    
     # Test vault addresses (GlueX vaults from task)
     vaults = [
         "0xe25514992597786e07872e6c5517fe1906c0cadd",
@@ -360,7 +758,8 @@ def test_client():
     print("-" * 50)
     
     # Find best opportunity
-    result = client.find_best_yield_opportunity(vaults, "1000000000000")
+    with GlueXClient(api_key, api_secret) as client:
+        result = client.find_best_yield_opportunity(vaults, "1000000000000")
     
     if result:
         vault_addr, yield_data, score = result
@@ -5,10 +5,19 @@ Monitors yields and triggers rebalancing operations
 
 import os
 import time
+import asyncio
 import logging
-from typing import Optional, Dict
+import requests
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, Tuple
 from dataclasses import dataclass
-from web3 import Web3
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+from web3.providers.websocket import WebsocketProviderV2
+from eth_abi import decode, encode
+from eth_abi.exceptions import DecodingError
+from eth_utils import function_signature_to_4byte_selector
 from eth_account import Account
 from dotenv import load_dotenv
 
@@ -21,6 +30,12 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=64)
+def to_checksum_address(address: str) -> str:
+    """Memoized Web3.to_checksum_address (avoids re-hashing known addresses)"""
+    return Web3.to_checksum_address(address)
+
+
 @dataclass
 class OptimizerConfig:
     """Configuration for the optimizer"""
@@ -34,6 +49,8 @@ class OptimizerConfig:
     min_apy_diff: float = 0.5  # 0.5% minimum difference
     gas_price_gwei: int = 1  # HyperEVM typically has low gas
     optimize_for: str = "sharpe"  # sharpe, apy, or safety
+    ws_url: str = ""  # Websocket RPC for event-driven cycles (empty = timer only)
+    min_cycle_interval: int = 30  # Debounce for event-triggered cycles
 
 
 class HyperYieldOptimizer:
@@ -82,22 +99,79 @@ class HyperYieldOptimizer:
         }
     ]
     
+    # Multicall3 is deployed at the same address on most EVM chains
+    MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+    
+    # Selectors of the zero-argument reads done every cycle
+    GET_ALLOCATION_SELECTOR = function_signature_to_4byte_selector('getCurrentAllocation()')
+    CAN_REBALANCE_SELECTOR = function_signature_to_4byte_selector('canRebalance()')
+    AGGREGATE3_SELECTOR = function_signature_to_4byte_selector('aggregate3((address,bool,bytes)[])')
+    EXECUTE_REBALANCE_SELECTOR = function_signature_to_4byte_selector(
+        'executeRebalance(address,uint256,address,bytes)'
+    )
+    
+    # executeRebalance head words after targetVault/amount never change:
+    # routerAddress = 0x0 (direct transfer) and the swapCalldata offset (4 words)
+    REBALANCE_STATIC_HEAD = bytes(32) + (4 * 32).to_bytes(32, 'big')
+    
+    # Logs that can change allocations or vault yields: the manager's
+    # Rebalanced and ERC-4626 Deposit/Withdraw (share Transfers are ignored)
+    TRIGGER_TOPICS = [
+        Web3.keccak(text='Rebalanced(address,address,uint256,uint256)').hex(),
+        Web3.keccak(text='Deposit(address,address,uint256,uint256)').hex(),
+        Web3.keccak(text='Withdraw(address,address,address,uint256,uint256)').hex()
+    ]
+    
     def __init__(self, config: OptimizerConfig):
         """Initialize the optimizer"""
         self.config = config
         
-        # Initialize Web3
-        self.w3 = Web3(Web3.HTTPProvider(config.rpc_url))
+        # Initialize Web3 over a pooled keep-alive session so every RPC of the
+        # main loop reuses the same TCP/TLS connection
+        rpc_session = requests.Session()
+        rpc_session.mount('https://', HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=10,
+            max_retries=Retry(total=3, backoff_factor=0.2)
+        ))
+        self.w3 = Web3(Web3.HTTPProvider(
+            config.rpc_url,
+            session=rpc_session,
+            request_kwargs={'timeout': 30}
+        ))
+        # Async client used to poll receipts without stalling the main loop
+        self.async_w3 = AsyncWeb3(AsyncHTTPProvider(config.rpc_url))
         self.account = Account.from_key(config.private_key)
         
-        logger.info(f"Optimizer account: {self.account.address}")
+        logger.info("Optimizer account: %s", self.account.address)
         
         # Initialize contracts
         self.manager_contract = self.w3.eth.contract(
-            address=Web3.to_checksum_address(config.manager_address),
+            address=to_checksum_address(config.manager_address),
             abi=self.MANAGER_ABI
         )
         
+        # The cycle's reads never change, so their calldata is encoded once
+        manager_address = self.manager_contract.address
+        self._cycle_state_call = {
+            'to': self.MULTICALL3_ADDRESS,
+            'data': Web3.to_hex(self.AGGREGATE3_SELECTOR + encode(
+                ['(address,bool,bytes)[]'],
+                [[
+                    (manager_address, False, self.GET_ALLOCATION_SELECTOR),
+                    (manager_address, False, self.CAN_REBALANCE_SELECTOR)
+                ]]
+            ))
+        }
+        self._get_allocation_call = {
+            'to': manager_address,
+            'data': Web3.to_hex(self.GET_ALLOCATION_SELECTOR)
+        }
+        self._can_rebalance_call = {
+            'to': manager_address,
+            'data': Web3.to_hex(self.CAN_REBALANCE_SELECTOR)
+        }
+        
         # Initialize GlueX client
         self.gluex_client = GlueXClient(
             config.gluex_api_key,
@@ -110,45 +184,112 @@ class HyperYieldOptimizer:
         self.last_check_time: int = 0
         self.rebalance_count: int = 0
         
+        # Cleared once Multicall3 turns out to be missing on the connected chain
+        self._multicall_supported = True
+        
+        # canRebalance() result read at the start of the running cycle
+        self._cycle_can_rebalance: Optional[bool] = None
+        
+        # Rebalance whose receipt is still being awaited
+        self._pending_rebalance: Optional[asyncio.Task] = None
+        
+        # Transaction parameters: nonce is snapshotted every cycle and bumped
+        # locally after each send; gas price is fixed by config
+        self._nonce: Optional[int] = None
+        self._gas_price_wei: int = Web3.to_wei(config.gas_price_gwei, 'gwei')
+        self._chain_id: Optional[int] = None
+        
+        # Diluted-APY amount used by the last scan; the next scan assumes it
+        # is unchanged so it can run concurrently with the on-chain reads
+        self._scan_amount: Optional[str] = None
+        
+        # Set by the websocket listener when a watched contract emits a log
+        self._trigger = asyncio.Event()
+        
         logger.info("HyperYield Optimizer initialized successfully")
     
+    @property
+    def cache_stats(self) -> Dict:
+        """Hit/miss/refresh counters of the GlueX response cache"""
+        return dict(self.gluex_client.cache.stats)
+    
     def get_current_allocation(self) -> Dict:
         """Get current vault allocation from contract"""
         try:
-            vault, amount, last_update = self.manager_contract.functions.getCurrentAllocation().call()
-            return {
-                'vault': vault,
-                'amount': amount,
-                'last_update': last_update
-            }
+            return self._decode_allocation(self.w3.eth.call(self._get_allocation_call))
         except Exception as e:
-            logger.error(f"Error getting current allocation: {e}")
+            logger.error("Error getting current allocation: %s", e)
             return {'vault': None, 'amount': 0, 'last_update': 0}
     
     def can_rebalance(self) -> bool:
         """Check if rebalancing is allowed (cooldown period)"""
+        if self._cycle_can_rebalance is not None:
+            return self._cycle_can_rebalance
+        
         try:
-            return self.manager_contract.functions.canRebalance().call()
+            (can_rebalance,) = decode(['bool'], self.w3.eth.call(self._can_rebalance_call))
+            return can_rebalance
         except Exception as e:
-            logger.error(f"Error checking rebalance status: {e}")
+            logger.error("Error checking rebalance status: %s", e)
             return False
     
-    def find_best_opportunity(self) -> Optional[tuple]:
+    async def aread_cycle_state(self) -> Tuple[Dict, bool]:
+        """
+        Read current allocation and rebalance cooldown in one RPC
+        
+        Both view calls are batched through Multicall3; if that fails they are
+        issued individually, and for good once the result cannot be decoded
+        (e.g. no Multicall3 code on the connected chain).
+        
+        Returns:
+            Tuple of (allocation dict, can_rebalance)
+        """
+        if self._multicall_supported:
+            try:
+                data = await self.async_w3.eth.call(self._cycle_state_call)
+            except Exception as e:
+                logger.warning("Multicall read failed, falling back to individual calls: %s", e)
+            else:
+                try:
+                    return self._decode_cycle_state(data)
+                except (DecodingError, ValueError) as e:
+                    logger.info("Multicall3 not usable (%s), using individual calls", e)
+                    self._multicall_supported = False
+        
+        return await asyncio.to_thread(
+            lambda: (self.get_current_allocation(), self.can_rebalance())
+        )
+    
+    def _decode_cycle_state(self, data: bytes) -> Tuple[Dict, bool]:
+        """Decode the Multicall3 aggregate3 result of the cycle's reads"""
+        (results,) = decode(['(bool,bytes)[]'], data)
+        (_, alloc_data), (_, can_data) = results
+        
+        (can_rebalance,) = decode(['bool'], can_data)
+        return self._decode_allocation(alloc_data), can_rebalance
+    
+    def _decode_allocation(self, data: bytes) -> Dict:
+        """Decode getCurrentAllocation() return data"""
+        vault, amount, last_update = decode(['address', 'uint256', 'uint256'], data)
+        return {
+            'vault': to_checksum_address(vault),
+            'amount': amount,
+            'last_update': last_update
+        }
+    
+    async def find_best_opportunity(self, amount: str) -> Optional[tuple]:
         """Find the best yield opportunity across whitelisted vaults"""
         logger.info("Scanning vaults for best opportunity...")
         
-        # Get total assets in vault (for diluted APY calculation)
-        allocation = self.get_current_allocation()
-        amount = str(allocation['amount']) if allocation['amount'] > 0 else "1000000000000"
-        
-        # Find best opportunity using GlueX API
-        result = self.gluex_client.find_best_yield_opportunity(
+        return await self.gluex_client.afind_best_yield_opportunity(
             self.GLUEX_VAULTS,
             amount,
             self.config.optimize_for
         )
-        
-        return result
+    
+    def _diluted_amount(self, allocated: int) -> str:
+        """Amount used for diluted APY: current allocation or 1M USDC default"""
+        return str(allocated) if allocated > 0 else "1000000000000"
     
     def should_rebalance(
         self,
@@ -167,8 +308,9 @@ class HyperYieldOptimizer:
         apy_improvement = new_apy - current_apy
         if apy_improvement < self.config.min_apy_diff:
             logger.info(
-                f"APY improvement ({apy_improvement:.2f}%) below threshold "
-                f"({self.config.min_apy_diff}%)"
+                "APY improvement (%.2f%%) below threshold (%s%%)",
+                apy_improvement,
+                self.config.min_apy_diff
             )
             return False
         
@@ -177,40 +319,51 @@ class HyperYieldOptimizer:
             logger.info("Rebalance cooldown period active")
             return False
         
-        logger.info(f"Rebalancing recommended: +{apy_improvement:.2f}% APY improvement")
+        logger.info("Rebalancing recommended: +%.2f%% APY improvement", apy_improvement)
         return True
     
-    def execute_rebalance(
+    async def execute_rebalance(
         self,
         target_vault: str,
         amount: int,
         swap_calldata: bytes = b''
     ) -> bool:
-        """Execute rebalancing transaction"""
+        """Execute rebalancing transaction and wait for its receipt"""
         try:
-            logger.info(f"Executing rebalance to {target_vault[:10]}...")
+            logger.info("Executing rebalance to %s...", target_vault[:10])
+            
+            if self._nonce is None:
+                self._nonce = await self.async_w3.eth.get_transaction_count(
+                    self.account.address, 'pending'
+                )
+            
+            if self._chain_id is None:
+                self._chain_id = await self.async_w3.eth.chain_id
             
             # Build transaction
-            tx = self.manager_contract.functions.executeRebalance(
-                Web3.to_checksum_address(target_vault),
-                amount,
-                "0x0000000000000000000000000000000000000000",  # No router for direct transfers
-                swap_calldata
-            ).build_transaction({
-                'from': self.account.address,
+            tx = {
+                'to': self.manager_contract.address,
+                'data': self._encode_rebalance(target_vault, amount, swap_calldata),
+                'value': 0,
                 'gas': 500000,
-                'gasPrice': self.w3.to_wei(self.config.gas_price_gwei, 'gwei'),
-                'nonce': self.w3.eth.get_transaction_count(self.account.address)
-            })
+                'gasPrice': self._gas_price_wei,
+                'nonce': self._nonce,
+                'chainId': self._chain_id
+            }
             
             # Sign and send transaction
             signed_tx = self.account.sign_transaction(tx)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            tx_hash = await self.async_w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            self._nonce += 1
             
-            logger.info(f"Transaction sent: {tx_hash.hex()}")
+            logger.info("Transaction sent: %s", tx_hash.hex())
             
-            # Wait for confirmation
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            # Wait for confirmation without blocking the event loop
+            receipt = await self.async_w3.eth.wait_for_transaction_receipt(
+                tx_hash,
+                timeout=120,
+                poll_latency=2
+            )
             
             if receipt['status'] == 1:
                 logger.info("✅ Rebalancing successful!")
@@ -221,39 +374,100 @@ class HyperYieldOptimizer:
                 return False
                 
         except Exception as e:
-            logger.error(f"Error executing rebalance: {e}")
+            logger.error("Error executing rebalance: %s", e)
             return False
     
-    def run_optimization_cycle(self):
+    async def _snapshot_nonce(self) -> Optional[int]:
+        """Read the pending nonce, or None so execute_rebalance fetches it later"""
+        try:
+            return await self.async_w3.eth.get_transaction_count(self.account.address, 'pending')
+        except Exception as e:
+            logger.warning("Error reading nonce, refetching before sending: %s", e)
+            return None
+    
+    def _encode_rebalance(self, target_vault: str, amount: int, swap_calldata: bytes) -> bytes:
+        """
+        ABI-encode executeRebalance(targetVault, amount, 0x0, swapCalldata)
+        
+        Only the target vault, amount and swap calldata tail vary, so they are
+        patched around the precomputed selector and static head words.
+        """
+        target = bytes.fromhex(to_checksum_address(target_vault)[2:])
+        padding = bytes(-len(swap_calldata) % 32)
+        
+        return (
+            self.EXECUTE_REBALANCE_SELECTOR
+            + target.rjust(32, b'\0')
+            + amount.to_bytes(32, 'big')
+            + self.REBALANCE_STATIC_HEAD
+            + len(swap_calldata).to_bytes(32, 'big')
+            + swap_calldata
+            + padding
+        )
+    
+    async def _rebalance(self, target_vault: str, amount: int, new_apy: float):
+        """Execute a rebalance and record the new allocation once confirmed"""
+        if await self.execute_rebalance(target_vault, amount):
+            self.current_vault = target_vault
+            self.current_apy = new_apy
+            # Our own deposit moved TVL/diluted APY, so cached yields are outdated
+            self.gluex_client.cache.invalidate()
+            logger.info("📊 Total rebalances: %d", self.rebalance_count)
+    
+    async def run_optimization_cycle(self):
         """Run one optimization cycle"""
         logger.info("=" * 60)
         logger.info("Starting optimization cycle...")
         
-        # Get current allocation
-        allocation = self.get_current_allocation()
+        # Read allocation/cooldown (one round-trip), snapshot the pending nonce
+        # and scan yields all at once. The scan assumes last cycle's allocation
+        # amount, which only changes on rebalance; it is redone if it moved.
+        # This overlaps with any outstanding receipt wait as well.
+        self._cycle_can_rebalance = None
+        # A rebalance in flight now may be mined while the reads run, so this
+        # cycle's snapshot cannot be trusted for a decision either way
+        pending = self._pending_rebalance is not None and not self._pending_rebalance.done()
+        scan_amount = self._scan_amount or self._diluted_amount(0)
+        (allocation, self._cycle_can_rebalance), self._nonce, result = await asyncio.gather(
+            self.aread_cycle_state(),
+            self._snapshot_nonce(),
+            self.find_best_opportunity(scan_amount)
+        )
+        
+        self._scan_amount = self._diluted_amount(allocation['amount'])
+        if self._scan_amount != scan_amount:
+            result = await self.find_best_opportunity(self._scan_amount)
+        
         current_vault = allocation['vault']
         current_amount = allocation['amount']
         
         if current_vault and current_vault != "0x0000000000000000000000000000000000000000":
-            logger.info(f"Current vault: {current_vault[:10]}...")
-            logger.info(f"Current amount: {current_amount / 1e6:.2f} USDC")
+            logger.info("Current vault: %s...", current_vault[:10])
+            logger.info("Current amount: %.2f USDC", current_amount / 1e6)
         else:
             logger.info("No current allocation")
             current_vault = None
         
-        # Find best opportunity
-        result = self.find_best_opportunity()
-        
         if not result:
             logger.warning("No yield data available, skipping cycle")
+            self._cycle_can_rebalance = None
             return
         
         target_vault, yield_data, score = result
         
-        logger.info(f"Best opportunity: {target_vault[:10]}...")
-        logger.info(f"  APY: {yield_data.apy:.2f}%")
-        logger.info(f"  Score: {score:.4f}")
-        logger.info(f"  TVL: ${yield_data.tvl:,.0f}")
+        logger.info("Best opportunity: %s...", target_vault[:10])
+        logger.info("  APY: %.2f%%", yield_data.apy)
+        logger.info("  Score: %.4f", score)
+        logger.info("  TVL: $%.0f", yield_data.tvl)
+        
+        # Never submit a new rebalance while the previous one is unconfirmed.
+        # If it settled during this cycle, the allocation snapshot is outdated.
+        if pending:
+            logger.info("Waiting for pending rebalance to confirm...")
+            await self._pending_rebalance
+            logger.info("Pending rebalance settled, re-evaluating next cycle")
+            self._cycle_can_rebalance = None
+            return
         
         # Determine if rebalancing is needed
         if self.should_rebalance(
@@ -265,36 +479,95 @@ class HyperYieldOptimizer:
             # Use current amount or default minimum
             rebalance_amount = current_amount if current_amount > 0 else 1_000_000_000  # 1000 USDC
             
-            # Execute rebalancing
-            if self.execute_rebalance(target_vault, rebalance_amount):
-                self.current_vault = target_vault
-                self.current_apy = yield_data.apy
-                logger.info(f"📊 Total rebalances: {self.rebalance_count}")
+            # Execute rebalancing; the receipt is awaited in the background
+            self._pending_rebalance = asyncio.create_task(
+                self._rebalance(target_vault, rebalance_amount, yield_data.apy)
+            )
         
+        self._cycle_can_rebalance = None
         self.last_check_time = int(time.time())
     
-    def run(self):
+    async def _listen_for_events(self):
+        """Trigger a cycle on manager rebalances and GlueX vault deposits/withdrawals"""
+        addresses = [self.manager_contract.address] + [
+            to_checksum_address(vault) for vault in self.GLUEX_VAULTS
+        ]
+        
+        while True:
+            try:
+                async with AsyncWeb3.persistent_websocket(
+                    WebsocketProviderV2(self.config.ws_url)
+                ) as ws_w3:
+                    await ws_w3.eth.subscribe('logs', {
+                        'address': addresses,
+                        'topics': [self.TRIGGER_TOPICS]
+                    })
+                    logger.info("Subscribed to logs of %d contracts", len(addresses))
+                    
+                    async for _ in ws_w3.ws.listen_to_websocket():
+                        self._trigger.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Event subscription error: %s", e)
+            
+            # The check_interval timer keeps cycles running while reconnecting
+            logger.info("Reconnecting event subscription in 30s...")
+            await asyncio.sleep(30)
+    
+    async def _wait_for_trigger(self, cycle_started: float):
+        """Wait for on-chain activity, falling back to check_interval"""
+        if not self.config.ws_url:
+            logger.info("Sleeping for %ds...", self.config.check_interval)
+            await asyncio.sleep(self.config.check_interval)
+            return
+        
+        logger.info("Waiting up to %ds for on-chain activity...", self.config.check_interval)
+        try:
+            await asyncio.wait_for(self._trigger.wait(), timeout=self.config.check_interval)
+        except asyncio.TimeoutError:
+            return
+        
+        # Collapse bursts of events into a single cycle
+        delay = self.config.min_cycle_interval - (time.monotonic() - cycle_started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        logger.info("On-chain activity detected, starting cycle")
+    
+    async def run(self):
         """Main optimizer loop"""
         logger.info("🚀 HyperYield Optimizer started")
-        logger.info(f"Check interval: {self.config.check_interval}s")
-        logger.info(f"Min APY difference: {self.config.min_apy_diff}%")
-        logger.info(f"Optimization strategy: {self.config.optimize_for}")
+        logger.info("Check interval: %ds", self.config.check_interval)
+        logger.info("Min APY difference: %s%%", self.config.min_apy_diff)
+        logger.info("Optimization strategy: %s", self.config.optimize_for)
+        logger.info("Event-driven cycles: %s", "enabled" if self.config.ws_url else "disabled")
         logger.info("=" * 60)
         
+        listener = asyncio.create_task(self._listen_for_events()) if self.config.ws_url else None
+        
         while True:
             try:
-                self.run_optimization_cycle()
+                # Activity seen before this cycle starts is covered by it
+                self._trigger.clear()
+                cycle_started = time.monotonic()
+                await self.run_optimization_cycle()
+                await self._wait_for_trigger(cycle_started)
                 
-                logger.info(f"Sleeping for {self.config.check_interval}s...")
-                time.sleep(self.config.check_interval)
-                
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, asyncio.CancelledError):
                 logger.info("Shutting down optimizer...")
                 break
             except Exception as e:
-                logger.error(f"Error in optimization cycle: {e}", exc_info=True)
+                logger.error("Error in optimization cycle: %s", e, exc_info=True)
                 logger.info("Waiting 60s before retry...")
-                time.sleep(60)
+                await asyncio.sleep(60)
+        
+        if listener:
+            listener.cancel()
+        
+        await self.gluex_client.aclose()
+        
+        if self._pending_rebalance and not self._pending_rebalance.done():
+            logger.warning("Stopped before the last rebalance was confirmed")
         
         logger.info("HyperYield Optimizer stopped")
 
@@ -313,7 +586,9 @@ def main():
         gluex_api_secret=os.getenv('GLUEX_API_SECRET', ''),
         check_interval=int(os.getenv('CHECK_INTERVAL', '300')),
         min_apy_diff=float(os.getenv('MIN_APY_DIFF', '0.5')),
-        optimize_for=os.getenv('OPTIMIZE_FOR', 'sharpe')
+        optimize_for=os.getenv('OPTIMIZE_FOR', 'sharpe'),
+        ws_url=os.getenv('HYPEREVM_WS_URL', ''),
+        min_cycle_interval=int(os.getenv('MIN_CYCLE_INTERVAL', '30'))
     )
     
     # Validate configuration
@@ -331,7 +606,10 @@ def main():
     
     # Create and run optimizer
     optimizer = HyperYieldOptimizer(config)
-    optimizer.run()
+    try:
+        asyncio.run(optimizer.run())
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
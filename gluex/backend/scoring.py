@@ -0,0 +1,158 @@
+"""
+Vault Scoring
+Vectorized risk and strategy scores over many vaults at once
+"""
+
+import numpy as np
+from typing import Tuple
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the NumPy path is used without it
+    njit = None
+
+# Below this many vaults NumPy beats the Numba kernel's call overhead
+NUMBA_MIN_VAULTS = 256
+
+STRATEGIES = {"sharpe": 0, "apy": 1, "safety": 2}
+
+
+def calculate_risk_scores(apy: np.ndarray, tvl: np.ndarray) -> np.ndarray:
+    """
+    Array version of GlueXClient._calculate_risk_score
+
+    Args:
+        apy: Annual percentage yields
+        tvl: Total values locked
+
+    Returns:
+        Risk scores (0-100, lower is better)
+    """
+    apy_risk = np.minimum(apy / 100, 1.0) * 50
+    tvl_safety = np.maximum(0, 50 - (tvl / 10_000_000) * 10)
+    return np.minimum(apy_risk + tvl_safety, 100)
+
+
+def calculate_sharpe_ratios(
+    apy: np.ndarray,
+    risk: np.ndarray,
+    risk_free_rate: float = 0.05
+) -> np.ndarray:
+    """
+    Array version of GlueXClient.calculate_sharpe_ratio
+
+    Vaults with zero risk score (zero volatility) get a ratio of 0.
+    """
+    volatility = np.where(risk == 0, np.inf, risk / 100)
+    return (apy / 100 - risk_free_rate) / volatility
+
+
+def strategy_scores(
+    apy: np.ndarray,
+    risk: np.ndarray,
+    optimize_for: str = "sharpe",
+    risk_free_rate: float = 0.05
+) -> np.ndarray:
+    """
+    Score vaults with known risk scores for an optimization strategy
+
+    Args:
+        apy: Annual percentage yields
+        risk: Risk scores from calculate_risk_scores
+        optimize_for: "sharpe", "apy" or "safety" (unknown values use sharpe)
+        risk_free_rate: Risk-free rate for the Sharpe ratio
+
+    Returns:
+        Strategy scores (higher is better)
+    """
+    if optimize_for == "apy":
+        return apy.copy()
+    if optimize_for == "safety":
+        return -risk  # Lower risk = higher score
+    return calculate_sharpe_ratios(apy, risk, risk_free_rate)
+
+
+def score_vaults(
+    apy: np.ndarray,
+    tvl: np.ndarray,
+    optimize_for: str = "sharpe",
+    risk_free_rate: float = 0.05
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score vaults for an optimization strategy
+
+    Args:
+        apy: Annual percentage yields
+        tvl: Total values locked
+        optimize_for: "sharpe", "apy" or "safety" (unknown values use sharpe)
+        risk_free_rate: Risk-free rate for the Sharpe ratio
+
+    Returns:
+        Tuple of (risk scores, strategy scores - higher is better)
+    """
+    risk = calculate_risk_scores(apy, tvl)
+    return risk, strategy_scores(apy, risk, optimize_for, risk_free_rate)
+
+
+def _score_and_select(apy, risk, strategy, risk_free_rate, scores_out):
+    """
+    Fused single-pass kernel: fill the score array and return the best index
+
+    Mirrors strategy_scores exactly, including Sharpe = 0 for zero risk and
+    first-max tie-breaking.
+    """
+    best_index = 0
+    best_score = 0.0
+
+    for i in range(apy.size):
+        if strategy == 1:
+            score = apy[i]
+        elif strategy == 2:
+            score = -risk[i]
+        else:
+            volatility = risk[i] / 100
+            score = ((apy[i] / 100) - risk_free_rate) / volatility if volatility != 0 else 0.0
+
+        scores_out[i] = score
+
+        if i == 0 or score > best_score:
+            best_score = score
+            best_index = i
+
+    return best_index
+
+
+if njit is not None:
+    _score_and_select = njit(cache=True, fastmath=True)(_score_and_select)
+
+
+def select_best(
+    apy: np.ndarray,
+    risk: np.ndarray,
+    optimize_for: str = "sharpe",
+    risk_free_rate: float = 0.05
+) -> Tuple[np.ndarray, int]:
+    """
+    Score vaults with known risk scores and pick the best one
+
+    Large vault universes go through the compiled Numba kernel when Numba
+    is installed; otherwise the vectorized NumPy path is used.
+
+    Args:
+        apy: Annual percentage yields (float64)
+        risk: Risk scores from calculate_risk_scores (float64)
+        optimize_for: "sharpe", "apy" or "safety" (unknown values use sharpe)
+        risk_free_rate: Risk-free rate for the Sharpe ratio
+
+    Returns:
+        Tuple of (strategy scores, index of the best vault)
+    """
+    if njit is not None and apy.size >= NUMBA_MIN_VAULTS:
+        scores = np.empty_like(apy)
+        best = _score_and_select(
+            apy, risk, STRATEGIES.get(optimize_for, 0), risk_free_rate, scores
+        )
+        return scores, int(best)
+
+    scores = strategy_scores(apy, risk, optimize_for, risk_free_rate)
+    return scores, int(np.argmax(scores))
@@ -0,0 +1,9 @@
+"""
+Pytest configuration
+The backend modules import each other as top-level scripts
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
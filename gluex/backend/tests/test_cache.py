@@ -0,0 +1,118 @@
+"""
+Tests for the stale-while-revalidate response cache
+"""
+
+import pytest
+
+import cache
+from cache import FRESH, MISS, STALE, TTLCache, swr_cache
+
+
+class FakeClock:
+    """Stand-in for the time module with a manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class InlineThread:
+    """Runs a background refresh synchronously so its effect can be asserted"""
+
+    def __init__(self, target, daemon=None):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+class Getter:
+    """Minimal client exposing an swr_cache'd getter"""
+
+    def __init__(self):
+        self.cache = TTLCache()
+        self.calls = 0
+        self.result = "v1"
+
+    @swr_cache(ttl=60, stale=600)
+    def get(self, address: str, chain: str = "hyperevm"):
+        self.calls += 1
+        return self.result
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache, "time", fake)
+    monkeypatch.setattr(cache.threading, "Thread", InlineThread)
+    return fake
+
+
+def test_entry_goes_fresh_then_stale_then_miss(clock):
+    store = TTLCache()
+    store.set("key", "value", ttl=60, stale=600)
+
+    assert store.get("key") == ("value", FRESH)
+
+    clock.now += 60
+    assert store.get("key") == ("value", STALE)
+
+    clock.now += 540
+    assert store.get("key") == (None, MISS)
+    assert store.stats == {"hits": 1, "stale_hits": 1, "misses": 1, "refreshes": 0}
+
+
+def test_miss_calls_through_and_fresh_hit_does_not(clock):
+    client = Getter()
+
+    assert client.get("0xa") == "v1"
+    assert client.get("0xa") == "v1"
+    assert client.get("0xa", "hyperevm") == "v1"
+    assert client.calls == 1
+
+    assert client.get("0xb") == "v1"
+    assert client.calls == 2
+
+
+def test_stale_hit_serves_old_value_and_refreshes(clock):
+    client = Getter()
+    client.get("0xa")
+
+    clock.now += 120
+    client.result = "v2"
+
+    assert client.get("0xa") == "v1"
+    assert client.calls == 2
+    assert client.cache.stats["refreshes"] == 1
+    assert client.get("0xa") == "v2"
+
+
+def test_expired_entry_is_refetched(clock):
+    client = Getter()
+    client.get("0xa")
+
+    clock.now += 600
+    client.result = "v2"
+
+    assert client.get("0xa") == "v2"
+    assert client.calls == 2
+
+
+def test_none_results_are_not_cached(clock):
+    client = Getter()
+    client.result = None
+
+    assert client.get("0xa") is None
+    assert client.get("0xa") is None
+    assert client.calls == 2
+
+
+def test_key_for_matches_wrapper_keys(clock):
+    client = Getter()
+    client.get("0xa")
+
+    value, state = client.cache.get(Getter.get.key_for("0xa"))
+    assert (value, state) == ("v1", FRESH)
+    assert Getter.get.key_for("0xa") == Getter.get.key_for("0xa", chain="hyperevm")
@@ -0,0 +1,103 @@
+"""
+Tests for the GlueX client's batch-yields fallback rules
+"""
+
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+from gluex_client import GlueXClient
+
+VAULTS = [
+    "0xe25514992597786e07872e6c5517fe1906c0cadd",
+    "0xcdc3975df9d1cf054f44ed238edfb708880292ea"
+]
+
+
+def json_response(body, status_code: int = 200) -> httpx.Response:
+    return httpx.Response(status_code, content=orjson.dumps(body))
+
+
+def make_client(batch_response: httpx.Response):
+    """Client whose sync and async sessions answer from a mock transport"""
+    paths = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        if request.url.path == "/batch-diluted-apy":
+            return batch_response
+        return json_response({"apy": 5.0, "tvl": 20_000_000})
+
+    client = GlueXClient("key", "secret")
+    client.RETRY_BACKOFF = 0
+    client.session = httpx.Client(transport=httpx.MockTransport(handler))
+    client._async_session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client, paths
+
+
+def fetch_sync(client):
+    return client.get_yields_batch(VAULTS, "1000")
+
+
+def fetch_async(client):
+    return asyncio.run(client.aget_yields_batch(VAULTS, "1000"))
+
+
+fetchers = pytest.mark.parametrize("fetch", [fetch_sync, fetch_async], ids=["sync", "async"])
+
+
+@fetchers
+def test_batch_response_is_used(fetch):
+    client, paths = make_client(json_response({"results": [
+        {"apy": 7.0, "tvl": 30_000_000},
+        {"apy": 3.0, "tvl": 10_000_000}
+    ]}))
+
+    table = fetch(client)
+
+    assert paths == ["/batch-diluted-apy"]
+    assert table.apy.tolist() == [7.0, 3.0]
+    assert table.tvl.tolist() == [30_000_000, 10_000_000]
+
+
+@fetchers
+@pytest.mark.parametrize("status_code", [400, 401, 404, 405])
+def test_client_error_disables_batching(fetch, status_code):
+    client, paths = make_client(httpx.Response(status_code))
+
+    assert len(fetch(client)) == len(VAULTS)
+    assert not client._batch_supported
+
+    paths.clear()
+    assert len(fetch(client)) == len(VAULTS)
+    assert "/batch-diluted-apy" not in paths
+
+
+@fetchers
+@pytest.mark.parametrize("status_code", [429, 500, 503])
+def test_transient_error_falls_back_once(fetch, status_code):
+    client, paths = make_client(httpx.Response(status_code))
+
+    assert len(fetch(client)) == len(VAULTS)
+    assert client._batch_supported
+    assert paths.count("/batch-diluted-apy") == client.MAX_RETRIES + 1
+    assert paths.count("/diluted-apy") == len(VAULTS)
+
+
+@fetchers
+@pytest.mark.parametrize("body", [
+    [1, 2],
+    {},
+    {"results": {"apy": 1}},
+    {"results": [{"apy": 7.0, "tvl": 30_000_000}]}
+], ids=["list", "no-results", "results-not-list", "wrong-count"])
+def test_malformed_batch_falls_back(fetch, body):
+    client, paths = make_client(json_response(body))
+
+    table = fetch(client)
+
+    assert client._batch_supported
+    assert paths.count("/diluted-apy") == len(VAULTS)
+    assert table.apy.tolist() == [5.0, 5.0]
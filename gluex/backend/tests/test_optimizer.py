@@ -0,0 +1,145 @@
+"""
+Tests for the optimizer's transaction parameters and Multicall3 cycle reads
+"""
+
+import asyncio
+
+import pytest
+from eth_abi import encode
+
+from optimizer import HyperYieldOptimizer, OptimizerConfig
+
+TARGET_VAULT = "0xe25514992597786e07872e6c5517fe1906c0cadd"
+
+
+@pytest.fixture
+def optimizer():
+    # Nothing connects to the RPC until a call is made
+    return HyperYieldOptimizer(OptimizerConfig(
+        rpc_url="http://127.0.0.1:8545",
+        private_key="0x" + "11" * 32,
+        vault_address="",
+        manager_address="0x" + "22" * 20,
+        gluex_api_key="key",
+        gluex_api_secret="secret"
+    ))
+
+
+@pytest.mark.parametrize("swap_calldata", [
+    b"",
+    bytes.fromhex("deadbeef"),
+    bytes(range(70))
+], ids=["empty", "short", "multi-word"])
+@pytest.mark.parametrize("amount", [1_000_000_000, 2**256 - 1])
+def test_encode_rebalance_matches_eth_abi(optimizer, swap_calldata, amount):
+    expected = HyperYieldOptimizer.EXECUTE_REBALANCE_SELECTOR + encode(
+        ["address", "uint256", "address", "bytes"],
+        [TARGET_VAULT, amount, "0x" + "00" * 20, swap_calldata]
+    )
+
+    assert optimizer._encode_rebalance(TARGET_VAULT, amount, swap_calldata) == expected
+
+
+def test_encode_rebalance_matches_contract_abi(optimizer):
+    expected = optimizer.manager_contract.encodeABI(
+        fn_name="executeRebalance",
+        args=[
+            optimizer.w3.to_checksum_address(TARGET_VAULT),
+            1_000_000_000,
+            "0x" + "00" * 20,
+            b""
+        ]
+    )
+
+    encoded = optimizer._encode_rebalance(TARGET_VAULT, 1_000_000_000, b"")
+    assert "0x" + encoded.hex() == expected
+
+
+@pytest.mark.parametrize("gas_price_gwei, expected", [(1, 10**9), (0.5, 5 * 10**8)])
+def test_gas_price_is_integer_wei(gas_price_gwei, expected):
+    optimizer = HyperYieldOptimizer(OptimizerConfig(
+        rpc_url="http://127.0.0.1:8545",
+        private_key="0x" + "11" * 32,
+        vault_address="",
+        manager_address="0x" + "22" * 20,
+        gluex_api_key="key",
+        gluex_api_secret="secret",
+        gas_price_gwei=gas_price_gwei
+    ))
+
+    assert optimizer._gas_price_wei == expected
+    assert isinstance(optimizer._gas_price_wei, int)
+
+
+def aggregate3_result(vault: str, amount: int, last_update: int, can_rebalance: bool) -> bytes:
+    """aggregate3 return data for the cycle's getCurrentAllocation/canRebalance reads"""
+    return encode(["(bool,bytes)[]"], [[
+        (True, encode(["address", "uint256", "uint256"], [vault, amount, last_update])),
+        (True, encode(["bool"], [can_rebalance]))
+    ]])
+
+
+def test_decode_cycle_state(optimizer):
+    allocation, can_rebalance = optimizer._decode_cycle_state(
+        aggregate3_result(TARGET_VAULT, 5_000_000_000, 1700000000, True)
+    )
+
+    assert allocation == {
+        "vault": optimizer.w3.to_checksum_address(TARGET_VAULT),
+        "amount": 5_000_000_000,
+        "last_update": 1700000000
+    }
+    assert can_rebalance is True
+
+
+def test_read_cycle_state_uses_multicall(optimizer, monkeypatch):
+    calls = []
+
+    async def call(tx):
+        calls.append(tx)
+        return aggregate3_result(TARGET_VAULT, 1, 2, False)
+
+    monkeypatch.setattr(optimizer.async_w3.eth, "call", call)
+
+    allocation, can_rebalance = asyncio.run(optimizer.aread_cycle_state())
+
+    assert calls == [optimizer._cycle_state_call]
+    assert allocation["amount"] == 1
+    assert can_rebalance is False
+    assert optimizer._multicall_supported
+
+
+def test_undecodable_multicall_is_disabled(optimizer, monkeypatch):
+    calls = []
+    fallback = ({"vault": None, "amount": 0, "last_update": 0}, True)
+
+    async def call(tx):
+        calls.append(tx)
+        return b""  # No Multicall3 code at the address
+
+    monkeypatch.setattr(optimizer.async_w3.eth, "call", call)
+    monkeypatch.setattr(optimizer, "get_current_allocation", lambda: fallback[0])
+    monkeypatch.setattr(optimizer, "can_rebalance", lambda: fallback[1])
+
+    assert asyncio.run(optimizer.aread_cycle_state()) == fallback
+    assert asyncio.run(optimizer.aread_cycle_state()) == fallback
+    assert len(calls) == 1
+    assert not optimizer._multicall_supported
+
+
+def test_failed_multicall_rpc_is_retried(optimizer, monkeypatch):
+    calls = []
+    fallback = ({"vault": None, "amount": 0, "last_update": 0}, True)
+
+    async def call(tx):
+        calls.append(tx)
+        raise ConnectionError("rpc down")
+
+    monkeypatch.setattr(optimizer.async_w3.eth, "call", call)
+    monkeypatch.setattr(optimizer, "get_current_allocation", lambda: fallback[0])
+    monkeypatch.setattr(optimizer, "can_rebalance", lambda: fallback[1])
+
+    assert asyncio.run(optimizer.aread_cycle_state()) == fallback
+    assert asyncio.run(optimizer.aread_cycle_state()) == fallback
+    assert len(calls) == 2
+    assert optimizer._multicall_supported
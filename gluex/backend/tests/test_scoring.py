@@ -0,0 +1,101 @@
+"""
+Tests for vault scoring: the vectorized and fused kernel paths must agree
+with the scalar GlueXClient scoring they replaced
+"""
+
+import numpy as np
+import pytest
+
+import scoring
+from gluex_client import GlueXClient, YieldData
+from scoring import (
+    STRATEGIES,
+    calculate_risk_scores,
+    score_vaults,
+    select_best,
+    strategy_scores
+)
+
+
+def make_vaults(size: int, seed: int = 7):
+    """Random APY/TVL columns plus a zero-risk vault and a tied pair"""
+    rng = np.random.default_rng(seed)
+    apy = rng.uniform(0, 150, size)
+    tvl = rng.uniform(0, 80_000_000, size)
+
+    # Zero APY and TVL above 50M give a risk score of 0 (Sharpe = 0)
+    apy[0], tvl[0] = 0.0, 60_000_000.0
+    # Identical vaults must resolve to the first one
+    apy[2], tvl[2] = apy[1], tvl[1]
+
+    return apy, tvl
+
+
+@pytest.mark.parametrize("optimize_for", sorted(STRATEGIES))
+def test_kernel_matches_strategy_scores(optimize_for):
+    apy, tvl = make_vaults(512)
+    risk = calculate_risk_scores(apy, tvl)
+    scores_out = np.empty_like(apy)
+
+    best = scoring._score_and_select(
+        apy, risk, STRATEGIES[optimize_for], 0.05, scores_out
+    )
+    scores = strategy_scores(apy, risk, optimize_for, 0.05)
+
+    np.testing.assert_allclose(scores_out, scores)
+    assert best == np.argmax(scores)
+
+
+def test_kernel_breaks_ties_on_first_vault():
+    apy = np.array([10.0, 10.0, 5.0])
+    risk = calculate_risk_scores(apy, np.array([1e7, 1e7, 1e7]))
+
+    best = scoring._score_and_select(
+        apy, risk, STRATEGIES["apy"], 0.05, np.empty(3)
+    )
+
+    assert best == 0
+
+
+@pytest.mark.parametrize("size", [5, scoring.NUMBA_MIN_VAULTS])
+@pytest.mark.parametrize("optimize_for", ["sharpe", "apy", "safety", "unknown"])
+def test_select_best_matches_score_vaults(size, optimize_for):
+    apy, tvl = make_vaults(size)
+
+    expected_risk, expected_scores = score_vaults(apy, tvl, optimize_for)
+    scores, best = select_best(apy, expected_risk, optimize_for)
+
+    np.testing.assert_allclose(scores, expected_scores)
+    assert best == int(np.argmax(expected_scores))
+
+
+def scalar_score(client: GlueXClient, apy: float, tvl: float, optimize_for: str) -> tuple:
+    """Risk and score for one vault as the pre-vectorization client computed them"""
+    risk = client._calculate_risk_score(apy, tvl)
+    data = YieldData("0x0", apy, tvl, risk, 0)
+
+    if optimize_for == "apy":
+        return risk, data.apy
+    if optimize_for == "safety":
+        return risk, -data.risk_score
+    return risk, client.calculate_sharpe_ratio(data)
+
+
+@pytest.mark.parametrize("optimize_for", sorted(STRATEGIES))
+def test_vectorized_matches_scalar_client(optimize_for):
+    apy, tvl = make_vaults(64)
+    # Negative and above-cap APYs, plus zero and very large TVL
+    apy[3:7] = [-12.5, -0.1, 100.0, 250.0]
+    tvl[3:7] = [0.0, 5_000_000.0, 1e12, 50_000_000.0]
+
+    with GlueXClient("key", "secret") as client:
+        expected = [scalar_score(client, a, t, optimize_for) for a, t in zip(apy, tvl)]
+
+    risk, scores = score_vaults(apy, tvl, optimize_for)
+
+    np.testing.assert_allclose(risk, [r for r, _ in expected])
+    np.testing.assert_allclose(scores, [score for _, score in expected])
+    # The zero-risk vault gets a Sharpe of 0 rather than a division by zero
+    assert risk[0] == 0
+    if optimize_for == "sharpe":
+        assert scores[0] == 0